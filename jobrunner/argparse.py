@@ -1,5 +1,23 @@
 import os
 
+# Base flags which are forwarded to helper scripts: (attribute, flag, takes a value)
+_BASE_FLAG_SPECS = (
+    ("verbose", "-v", False),
+    ("stateDir", "--state-dir", True),
+    ("rcFile", "--rc-file", True),
+    ("debug", "--debug", False),
+    ("debugLevel", "--debugLocking", False),
+)
+
+_DEFAULT_STATE_DIR = "~/.local/share/jobDb"
+
+
+def _baseFlagDefaults():
+    return {
+        "stateDir": os.getenv("JOBRUNNER_STATE_DIR", _DEFAULT_STATE_DIR),
+        "rcFile": "~/.config/jobrc",
+    }
+
 
 def addArgumentParserBaseFlags(parser, logfileName):
     '''
@@ -7,8 +25,10 @@ def addArgumentParserBaseFlags(parser, logfileName):
     scripts included with jobrunner.
     Provides common flags for config file overrides, etc.
 
-    Provides ALL flags required by the Config class.
+    Provides ALL flags required by the Config class. The state directory depends
+    on the environment, call resolveBaseFlagDefaults() on the parsed args.
     '''
+    defaults = _baseFlagDefaults()
     parser.add_argument(
         "-V", "--version",
         help="Display version info",
@@ -26,11 +46,11 @@ def addArgumentParserBaseFlags(parser, logfileName):
         "--state-dir",
         dest="stateDir",
         metavar="DIR",
-        help="Specify state directory (default='%(default)s')",
-        default=os.getenv("JOBRUNNER_STATE_DIR", "~/.local/share/jobDb"))
+        help="Specify state directory (default=$JOBRUNNER_STATE_DIR or '{}')".format(
+            _DEFAULT_STATE_DIR))
     parser.add_argument("--rc-file", dest="rcFile",
                         help="Specify path to rc-file (default=\"%(default)s\")",
-                        default="~/.config/jobrc")
+                        default=defaults["rcFile"])
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -39,17 +59,29 @@ def addArgumentParserBaseFlags(parser, logfileName):
                         const="lock", help="Debug database locking")
 
 
-def baseParsedArgsToArgList(argv, args):
+def resolveBaseFlagDefaults(args):
+    '''
+    Fill in the base flag defaults which depend on the environment, so that a
+    parser can be built once and reused.
+    '''
+    if args.stateDir is None:
+        args.stateDir = _baseFlagDefaults()["stateDir"]
+    return args
+
+
+def baseParsedArgsToArgList(args):
+    '''
+    Rebuild the base flags from parsed args. Flags which take a value are only
+    included when they differ from the default.
+    '''
+    defaults = _baseFlagDefaults()
     argList = []
-    if args.verbose:
-        argList.append("-v")
-    if "--state-dir" in argv or "-d" in argv:
-        argList.extend(["--state-dir", args.stateDir])
-    if "--rc-file" in argv:
-        argList.extend(["--rc-file", args.rcFile])
-    if args.debug:
-        argList.append("--debug")
-    if args.debugLevel:
-        argList.append("--debugLocking")
+    for dest, flag, hasValue in _BASE_FLAG_SPECS:
+        value = getattr(args, dest)
+        if hasValue:
+            if value is not None and value != defaults[dest]:
+                argList.extend([flag, value])
+        elif value:
+            argList.append(flag)
 
     return argList
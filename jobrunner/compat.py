@@ -1,23 +1,46 @@
 #!/usr/bin/env python
 
-# pylint: disable=unused-import
+# pylint: disable=unused-import,import-outside-toplevel
 
-from typing import List
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Tuple
 
-try:
+if TYPE_CHECKING:
     from importlib import metadata
-    __importlib = True
-except ImportError:
-    # Running on pre-3.8 Python; use importlib-metadata package
-    import importlib_metadata as metadata
-    __importlib = False
-
-
-def get_plugins(group: str) -> List[metadata.EntryPoint]:
-    eps = metadata.entry_points()
-    if __importlib:
-        return list(eps.get(group, []))
-    return list(eps.select(group=group))
+
+
+def _importMetadata():
+    # importlib.metadata is slow to import, and only needed for plugin discovery
+    # and --version, so it is loaded on first use.
+    try:
+        from importlib import metadata as mod
+        isImportlib = True
+    except ImportError:
+        # Running on pre-3.8 Python; use importlib-metadata package
+        import importlib_metadata as mod
+        isImportlib = False
+    return mod, isImportlib
+
+
+def __getattr__(name):
+    if name == 'metadata':
+        return _importMetadata()[0]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def get_plugins(group: str) -> List['metadata.EntryPoint']:
+    return list(_entryPoints(group))
+
+
+@lru_cache(maxsize=None)
+def _entryPoints(group: str) -> Tuple['metadata.EntryPoint', ...]:
+    # entry_points() reads the metadata of every installed distribution, and the
+    # installed set doesn't change during the life of the interpreter.
+    mod, isImportlib = _importMetadata()
+    eps = mod.entry_points()
+    if isImportlib:
+        return tuple(eps.get(group, []))
+    return tuple(eps.select(group=group))
 
 
 def encoding_open(filename, mode='r', encoding='utf-8', **kwargs):
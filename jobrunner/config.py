@@ -1,9 +1,7 @@
 from __future__ import absolute_import, division, print_function
 
+import configparser
 import os
-import sys
-
-import six
 
 RC_FILE_HELP = """\
 Sample rcfile:
@@ -37,10 +35,10 @@ class ConfigEnum(object):
             assert enumName not in self.__slots__
 
     def names(self):
-        return six.iterkeys(self._enumVals)
+        return iter(self._enumVals.keys())
 
     def values(self):
-        return six.itervalues(self._enumVals)
+        return iter(self._enumVals.values())
 
     @property
     def defaultVal(self):
@@ -167,10 +165,7 @@ class Config(object):
         self.debugLevel = options.debugLevel if options.debugLevel else []
 
         rcFile = os.path.expanduser(options.rcFile)
-        if sys.version_info.major >= 3:
-            cfgParser = six.moves.configparser.RawConfigParser()
-        else:
-            cfgParser = six.moves.configparser.ConfigParser()
+        cfgParser = configparser.RawConfigParser()
         cfgParser.read(rcFile)
         self._mailDomain = _getConfig(
             cfgParser, "mail", "domain", os.getenv("HOSTNAME"))
@@ -8,12 +8,10 @@ import os.path
 import posixpath
 import subprocess
 import sys
-import tempfile
 import time
 from typing import List, Optional, Tuple
 from uuid import uuid4
 
-from dateutil import parser
 from dateutil.tz import tzlocal, tzutc
 
 from jobrunner import utils
@@ -41,6 +39,32 @@ LOG = logging.getLogger(__name__)
 LOGLOCK = logging.getLogger(__name__ + ".lock")
 
 
+def parseCheckpoint(val) -> datetime:
+    """Convert a checkpoint string ('.' for now) or datetime to a UTC datetime"""
+    if isinstance(val, str):
+        if val.strip() == ".":
+            checkpoint = utcNow()
+        else:
+            try:
+                # ISO-8601 is the common case, avoid the much slower dateutil parser
+                checkpoint = datetime.fromisoformat(val.strip())
+            except ValueError:
+                # pylint: disable=import-outside-toplevel
+                from dateutil import parser
+                checkpoint = parser.parse(val)
+            if not checkpoint.tzinfo:
+                checkpoint = checkpoint.replace(tzinfo=tzlocal())
+    elif isinstance(val, datetime):
+        if not val.tzinfo:
+            checkpoint = val.replace(tzinfo=tzlocal())
+        else:
+            checkpoint = val
+    else:
+        raise ValueError(
+            "Expecting either a string or a datetime.datetime")
+    return checkpoint.astimezone(tzutc())
+
+
 class NoMatchingJobError(Exception):
     pass
 
@@ -101,22 +125,7 @@ class DatabaseBase(DatabaseMeta):
             return epoch.replace(tzinfo=tzutc())
 
     def setCheckpoint(self, val):
-        if isinstance(val, str):
-            if val.strip() == ".":
-                checkpoint = utcNow()
-            else:
-                checkpoint = parser.parse(val)
-                if not checkpoint.tzinfo:
-                    checkpoint = checkpoint.replace(tzinfo=tzlocal())
-        elif isinstance(val, datetime):
-            if not val.tzinfo:
-                checkpoint = val.replace(tzinfo=tzlocal())
-            else:
-                checkpoint = val
-        else:
-            raise ValueError(
-                "Expecting either a string or a datetime.datetime")
-        utc = checkpoint.astimezone(tzutc())
+        utc = parseCheckpoint(val)
         self.db[self.CHECKPOINT] = json.dumps(dateTimeToJson(utc))
 
     checkpoint = property(getCheckpoint, setCheckpoint)
@@ -136,15 +145,13 @@ class DatabaseBase(DatabaseMeta):
     lastJob = property(lastJobGet, lastJobSet)
 
     def keys(self):
-        return list(filter(self.filterJobs, list(self.db.keys())))
+        return list(filter(self.filterJobs, self.db.keys()))
 
     def recentGet(self):
-        if self.RECENT in self.db:
-            try:
-                return json.loads(self.db[self.RECENT])
-            except json.JSONDecodeError:
-                return []
-        else:
+        # Read every time a job is added, so fetch it without a separate lookup
+        try:
+            return json.loads(self.db[self.RECENT])
+        except (KeyError, json.JSONDecodeError):
             return []
 
     def recentSet(self, key):
@@ -180,14 +187,42 @@ class DatabaseBase(DatabaseMeta):
         del self.db[key]
         self.recentDel(key)
 
+    def deleteKeys(self, keys):
+        """
+        Delete several keys at once, updating the item count and the recent list
+        just once rather than for each key
+        """
+        deleted = self.db.deleteKeys(keys)
+        if not deleted:
+            return
+        self.count = -deleted
+        recent = self.recent
+        if recent:
+            removed = set(keys)
+            remaining = [key for key in recent if key not in removed]
+            if len(remaining) != len(recent):
+                self.db[self.RECENT] = json.dumps(remaining)
+
     def __getitem__(self, key):
         if key == self.SV:
             return self.db[key]
         else:
-            ret = json.loads(self.db[key], object_hook=decodeJobInfo)
-            if isinstance(ret, JobInfo):
-                ret.parent = self._parent
-            return ret
+            return self._decode(self.db[key])
+
+    def _decode(self, value):
+        ret = json.loads(value, object_hook=decodeJobInfo)
+        if isinstance(ret, JobInfo):
+            ret.parent = self._parent
+        return ret
+
+    def items(self):
+        """
+        Iterate over (key, job) for the jobs in the DB, reading all of them with a
+        single query
+        """
+        for key, value in self.db.items():
+            if self.filterJobs(key):
+                yield key, self._decode(value)
 
     def __contains__(self, key):
         return key in self.db
@@ -197,12 +232,7 @@ class DatabaseBase(DatabaseMeta):
             self.__class__.__name__, self.count, self.ident, self.db[self.SV])
 
     def uidx(self):
-        if self.IDX in self.db:
-            cur = json.loads(self.db[self.IDX])
-        else:
-            cur = 0
-        self.db[self.IDX] = json.dumps(cur + 1)
-        return cur
+        return self.db.increment(self.IDX)
 
 
 def reminderWatchSummary(activeReminder):
@@ -274,6 +304,17 @@ class JobsBase(object):
     def unlock(self):
         LOGLOCK.debug("unlock DB")
 
+    def forkLocked(self) -> int:
+        """
+        Fork while holding the lock, like os.fork(). On return the child still has
+        the DB locked, while the parent has released it.
+        """
+        self.unlock()
+        pid = os.fork()
+        if pid == 0:
+            self.lock()
+        return pid
+
     def prune(self, exceptNum=None):
         allJobs = []
         db = self.inactive
@@ -285,11 +326,12 @@ class JobsBase(object):
         allJobs.sort()
         limit = PRUNE_NUM if exceptNum is None else exceptNum
         if len(allJobs) > limit:
-            for job in allJobs[: -1 * limit]:
+            pruned = allJobs[: -1 * limit]
+            for job in pruned:
                 if self.config.verbose:
                     sprint("Prune %r" % job.key)
                 job.removeLog(self.config.verbose)
-                del self.inactive[job.key]
+            self.inactive.deleteKeys([job.key for job in pruned])
 
     @staticmethod
     def getDbSorted(db: DatabaseBase,
@@ -303,19 +345,14 @@ class JobsBase(object):
         if filterWs:
             curWs = utils.workspaceIdentity()
         jobList = []
-        for k in db.keys():
-            if db.filterJobs(k):
-                try:
-                    job = db[k]
-                except KeyError:
-                    continue
-                if cpUtc:
-                    refTime = job.createTime
-                    if not refTime or refTime < cpUtc:
-                        continue
-                if filterWs and job.workspace != curWs:
+        for _, job in db.items():
+            if cpUtc:
+                refTime = job.createTime
+                if not refTime or refTime < cpUtc:
                     continue
-                jobList.append(job)
+            if filterWs and job.workspace != curWs:
+                continue
+            jobList.append(job)
             if _limit and len(jobList) > _limit:
                 break
         jobList.sort(reverse=False)
@@ -443,7 +480,9 @@ class JobsBase(object):
         return dot
 
     def countInactive(self):
-        return len(self.inactive.db) - (len(self.inactive.special) - 1)
+        # The item count is kept up to date as jobs are added and removed, so
+        # there's no need to count the rows.
+        return self.inactive.count
 
     def listActive(self, thisWs, pane, useCp, includeReminders, keysOnly=False):
         # pylint: disable=too-many-arguments
@@ -508,8 +547,7 @@ class JobsBase(object):
             # Search in active jobs
             candidates = []
             curWs = utils.workspaceIdentity()
-            for k in self.active.keys():
-                j = self.active[k]
+            for _, j in self.active.items():
                 if j.mailJob:
                     continue
                 if skipReminders and j.reminder:
@@ -527,9 +565,10 @@ class JobsBase(object):
 
             candidates = []
             for k in self.inactive.recent:
-                if k not in self.inactive:
+                try:
+                    j = self.inactive[k]
+                except KeyError:
                     continue
-                j = self.inactive[k]
                 if isinstance(j, str):
                     continue
                 if j.mailJob:
@@ -559,13 +598,15 @@ class JobsBase(object):
         key = recent[index]
         return self.getJobMatch(key, thisWs, skipReminders=True).logfile
 
-    def _wait(self, func, desc, verbose, _timeout=None):
+    def _wait(self, func, desc, verbose, pids=()):
         if func():
             return
         if verbose:
             sprint("\nWaiting for %s" % desc)
+        pids = [pid for pid in pids if pid]
         while not func():
-            safeSleep(1, self)
+            # Wakes up as soon as one of the job processes exits
+            safeSleep(1, self, pids)
             if verbose:
                 sys.stdout.write(".")
                 sys.stdout.flush()
@@ -575,7 +616,8 @@ class JobsBase(object):
             lambda: job.key not in self.active.db,
             "job '%s'" %
             job,
-            verbose)
+            verbose,
+            pids=[job.pid])
 
     def inactiveKey(self, key):
         if key not in self.inactive:
@@ -583,9 +625,9 @@ class JobsBase(object):
         j = self.inactive[key]
         return isinstance(j, JobInfo)
 
-    def waitInactive(self, key, verbose):
+    def waitInactive(self, key, verbose, pid=None):
         self._wait(lambda: self.inactiveKey(key), 'inactive key "%s"' % key,
-                   verbose)
+                   verbose, pids=[pid])
 
     def showJobList(self, joblist, tag, clearLen):
         timestr = datetime.now().strftime(utils.DATETIME_FMT)
@@ -811,6 +853,7 @@ class JobsBase(object):
         dirName = getLogParentDir(logfile)
         logDir = posixpath.join(self.config.logDir, dirName)
         os.makedirs(logDir, exist_ok=True)
+        import tempfile  # pylint: disable=import-outside-toplevel
         (fd, logFileName) = tempfile.mkstemp(suffix=logfile, dir=logDir)
         job.logfile = logFileName
         job.parent = self
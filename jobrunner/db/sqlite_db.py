@@ -1,33 +1,68 @@
 from __future__ import absolute_import, division, print_function
 
-from logging import getLogger
+from logging import DEBUG, getLogger
+import os
 import sqlite3
 
-from . import DatabaseBase, DatabaseMeta, JobsBase, resolveDbFile
+from . import LOGLOCK, DatabaseBase, DatabaseMeta, JobsBase, resolveDbFile
 
 LOG = getLogger(__name__)
 
 
 class Sqlite3KeyValueStore(DatabaseMeta):
-    def __init__(self, table, schemaVersion):
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, table, schemaVersion, cacheKeys=False):
         self._schemaVersion = schemaVersion
         self._schemaOk = False
         self._dirty = 0
         self.conn = None
         self._table = table
         self._locked = False
+        # When enabled, the keys read by keys() are kept for membership tests
+        # until the end of the locked section, in sync with our own writes.
+        self._cacheKeys = cacheKeys
+        self._keyCache = None
+        # The statements are built once, sqlite3 keeps them compiled per
+        # connection keyed by the SQL text.
+        self._sqlKeys = "SELECT key FROM " + table
+        self._sqlItems = "SELECT key, value FROM " + table
+        self._sqlCount = "SELECT COUNT(key) FROM " + table
+        self._sqlGet = "SELECT value FROM " + table + " WHERE key=?"
+        self._sqlContains = "SELECT 1 FROM " + table + " WHERE key=?"
+        if sqlite3.sqlite_version_info >= (3, 24, 0):
+            # Jobs are written back after most changes, leave the row alone if
+            # the value didn't actually change.
+            self._sqlSet = (
+                "INSERT INTO " + table + " VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value "
+                "WHERE value IS NOT excluded.value")
+        else:
+            self._sqlSet = "INSERT OR REPLACE INTO " + table + " VALUES (?, ?)"
+        self._sqlDel = "DELETE FROM " + table + " WHERE key=?"
+        self._sqlIncrement = (
+            "INSERT INTO " + table + " VALUES (?, '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1 "
+            "RETURNING CAST(value AS INTEGER) - 1")
 
     def keys(self):
-        cursor = self._doQuery("SELECT key FROM " + self._table)
-        return [r[0] for r in cursor.fetchall()]
+        # Build the list straight from the cursor rather than a fetched copy
+        keys = [r[0] for r in self._doQuery(self._sqlKeys)]
+        if self._cacheKeys and self._locked:
+            self._keyCache = set(keys)
+        return keys
+
+    def items(self):
+        # Rows are fetched from the cursor as the caller iterates
+        return self._doQuery(self._sqlItems)
 
     def __len__(self):
-        query = "SELECT COUNT(key) FROM " + self._table
-        cursor = self._doQuery(query)
+        cursor = self._doQuery(self._sqlCount)
         return int(cursor.fetchone()[0])
 
     def debug(self, fmt, *args):
-        LOG.debug("%-13s " + fmt, *([f"[{self._table}]"] + list(args)))
+        # Called for every lock, unlock and write, skip building the arguments
+        if LOG.isEnabledFor(DEBUG):
+            LOG.debug("%-13s " + fmt, f"[{self._table}]", *args)
 
     @property
     def dirty(self):
@@ -42,90 +77,101 @@ class Sqlite3KeyValueStore(DatabaseMeta):
         assert not self._locked
         self.debug("set locked")
         self._locked = True
+        self._keyCache = None
 
     def unlock(self):
         assert self._locked
         self.debug("set unlocked")
         self._locked = False
+        self._keyCache = None
 
     def __setitem__(self, key, value):
-        self._doQuery(
-            "INSERT OR REPLACE INTO " + self._table + " VALUES (?, ?)", key, value)
+        self._doQuery(self._sqlSet, key, value)
+        if self._keyCache is not None:
+            self._keyCache.add(key)
         self._setDirty(key)
 
     def __getitem__(self, key):
-        cursor = self._doQuery(
-            "SELECT value FROM " +
-            self._table +
-            " WHERE key=?",
-            key)
+        cursor = self._doQuery(self._sqlGet, key)
         row = cursor.fetchone()
         if not row:
             raise KeyError(key)
         return row[0]
 
     def __delitem__(self, key):
-        self._doQuery("DELETE FROM " + self._table + " WHERE key=?", key)
+        self._doQuery(self._sqlDel, key)
+        if self._keyCache is not None:
+            self._keyCache.discard(key)
+        self._setDirty(key)
+
+    def deleteKeys(self, keys):
+        """Delete the given keys, ignoring missing ones, return the number deleted"""
+        assert self._schemaOk
+        cursor = self.conn.executemany(self._sqlDel, [(key,) for key in keys])
+        if self._keyCache is not None:
+            self._keyCache.difference_update(keys)
+        self._setDirty(keys)
+        return cursor.rowcount
+
+    def increment(self, key):
+        """Add one to the integer value of key (0 if unset), return the old value"""
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            cur = self._doQuery(self._sqlIncrement, key).fetchall()[0][0]
+        else:
+            row = self._doQuery(self._sqlGet, key).fetchone()
+            cur = int(row[0]) if row else 0
+            self._doQuery(self._sqlSet, key, str(cur + 1))
+        if self._keyCache is not None:
+            self._keyCache.add(key)
         self._setDirty(key)
+        return cur
 
     def __contains__(self, key):
-        cursor = self._doQuery(
-            "SELECT value FROM " +
-            self._table +
-            " WHERE key=?",
-            key)
+        if self._keyCache is not None:
+            return key in self._keyCache
+        cursor = self._doQuery(self._sqlContains, key)
         row = cursor.fetchone()
         return row is not None
 
-    def _cursor(self):
-        return self.conn.cursor()
-
     def _doQuery(self, query, *args):
         assert self._schemaOk
-        cursor = self._cursor()
-        cursor.execute(query, args or [])
-        return cursor
+        return self.conn.execute(query, args)
 
-    def _getMeta(self, cursor, key):
-        cursor = cursor.execute(
-            "SELECT value FROM " + self._table + " WHERE key = ?", (key,))
-        row = cursor.fetchone()
+    def _getMeta(self, conn, key):
+        row = conn.execute(self._sqlGet, (key,)).fetchone()
         return row[0] if row else None
 
-    def _createNew(self, cursor):
-        cursor.execute("DROP TABLE IF EXISTS " + self._table)
-        cursor.execute(f"""
+    def _createNew(self, conn):
+        conn.execute("DROP TABLE IF EXISTS " + self._table)
+        conn.execute(f"""
         CREATE TABLE {self._table} (
             key TEXT PRIMARY KEY,
             value TEXT
         )
         """)
-        for key, value in self.defaultValueGenerator(self._schemaVersion):
-            cursor.execute("INSERT INTO " + self._table + " VALUES (?, ?)",
-                           (key, value))
-        cursor.connection.commit()
+        conn.executemany(
+            self._sqlSet, self.defaultValueGenerator(self._schemaVersion))
+        conn.commit()
 
     def setup(self, conn):
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM sqlite_master WHERE type='table' AND name=?",
-            (self._table,))
-        tables = cursor.fetchall()
+        tables = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+            (self._table,)).fetchall()
         if not tables:
-            self._createNew(cursor)
-        dbVer = self._getMeta(cursor, self.SV)
+            self._createNew(conn)
+        dbVer = self._getMeta(conn, self.SV)
         if dbVer != self._schemaVersion:
-            self._createNew(cursor)
+            self._createNew(conn)
         self._schemaOk = True
 
 
 class Sqlite3Database(DatabaseBase):
     schemaVersion = "0"
 
-    def __init__(self, parent, config, instanceId, name):
+    def __init__(self, parent, config, instanceId, name, cacheKeys=False):
         # pylint: disable=too-many-arguments
         super(Sqlite3Database, self).__init__(parent, config, instanceId)
-        self._db = Sqlite3KeyValueStore(name, self.schemaVersion)
+        self._db = Sqlite3KeyValueStore(name, self.schemaVersion, cacheKeys)
         self.ident = name + "Jobs"
 
     @property
@@ -166,7 +212,8 @@ class Sqlite3Jobs(JobsBase):
         self._filename = resolveDbFile(config, "jobsDb.sqlite")
         self._lock.lock()
         conn = connectDb(self._filename)
-        self.active = Sqlite3Database(self, config, self._instanceId, "active")
+        self.active = Sqlite3Database(self, config, self._instanceId, "active",
+                                      cacheKeys=True)
         self.active.setup(conn)
         self.inactive = Sqlite3Database(
             self, config, self._instanceId, "inactive")
@@ -176,24 +223,50 @@ class Sqlite3Jobs(JobsBase):
     def isLocked(self):
         return self._lock.isLocked()
 
-    def lock(self):
-        super().lock()
-        self._lock.lock()
+    def _connect(self):
         conn = connectDb(self._filename)
         self.active.conn = conn
         self.inactive.conn = conn
-        self.active.lock()
-        self.inactive.lock()
         conn.execute("begin")
 
-    def unlock(self):
-        super().unlock()
+    def _disconnect(self):
         conn = self.active.conn
         if self.active.dirty or self.inactive.dirty:
             conn.commit()
-        self.active.unlock()
-        self.inactive.unlock()
         self.active.conn = None
         self.inactive.conn = None
         conn.close()
+
+    def lock(self):
+        super().lock()
+        self._lock.lock()
+        self._connect()
+        self.active.lock()
+        self.inactive.lock()
+
+    def unlock(self):
+        super().unlock()
+        self._disconnect()
+        self.active.unlock()
+        self.inactive.unlock()
         self._lock.unlock()
+
+    def forkLocked(self):
+        # An sqlite connection must not be used on both sides of a fork, so the
+        # changes so far are committed and the child reconnects. The flock belongs
+        # to the open file shared by both processes, so the parent just closes its
+        # copy and the lock stays with the child.
+        LOGLOCK.debug("fork with DB locked")
+        self._disconnect()
+        try:
+            pid = os.fork()
+        except OSError:
+            self._connect()
+            raise
+        if pid == 0:
+            self._connect()
+        else:
+            self.active.unlock()
+            self.inactive.unlock()
+            self._lock.unlock()
+        return pid
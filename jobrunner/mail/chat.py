@@ -9,9 +9,8 @@ import os
 import sys
 
 import requests
-import six
 
-from jobrunner.argparse import addArgumentParserBaseFlags
+from jobrunner.argparse import addArgumentParserBaseFlags, resolveBaseFlagDefaults
 from jobrunner.binutils import binDescriptionWithStandardFooter
 from jobrunner.config import CHATMAIL_AT_ALL, Config
 
@@ -159,7 +158,7 @@ def parseArgs(args=None):
                     "(default=%(default)s)")
     ap.add_argument("toAddr", metavar="to-addr", nargs="+")
 
-    return ap.parse_args(args)
+    return resolveBaseFlagDefaults(ap.parse_args(args))
 
 
 OK = 0
@@ -184,7 +183,7 @@ def main(args=None):
             return ERROR
         hooksToUsers[hook].append(user)
 
-    for hook, users in six.iteritems(hooksToUsers):
+    for hook, users in hooksToUsers.items():
         userAts = _getUserAtTokens(users, config)
 
         subjectAndAts = " ".join(userAts + [subject])
@@ -1,33 +1,26 @@
 #!/usr/bin/env python
 import argparse
-import errno
-import hashlib
+from functools import lru_cache
 import os
 from os.path import expanduser
-from subprocess import (
-    DEVNULL,
-    PIPE,
-    CalledProcessError,
-    Popen,
-    check_call,
-    check_output,
-)
+from subprocess import DEVNULL, PIPE, CalledProcessError, Popen, TimeoutExpired, run
 import sys
-import tempfile
 import time
-from typing import IO, List, Optional, Tuple
+from typing import List, Optional, Tuple
 
-import dateutil.parser
 import dateutil.tz
-import six
 
 import jobrunner.logging
 
-from .argparse import addArgumentParserBaseFlags, baseParsedArgsToArgList
+from .argparse import (
+    addArgumentParserBaseFlags,
+    baseParsedArgsToArgList,
+    resolveBaseFlagDefaults,
+)
 from .binutils import binDescriptionWithStandardFooter
-from .compat import encoding_open, metadata
+from .compat import encoding_open
 from .config import Config
-from .db import JobsBase, NoMatchingJobError
+from .db import JobsBase, NoMatchingJobError, parseCheckpoint
 from .info import JobInfo
 from .plugins import Plugins
 from .service import service
@@ -42,13 +35,21 @@ from .utils import (
     STOP_STOP,
     autoDecode,
     doMsg,
+    getPstrees,
     keyEscape,
     lockedSection,
+    pidOk,
     quiet,
     robotInfo,
+    safeSleep,
     setQuiet,
     showMsgs,
+    showPstreeForJob,
     sprint,
+    tailLines,
+    waitForAnyPid,
+    workspaceIdentity,
+    workspaceProject,
 )
 
 _DEBUG_LOG_FILE_NAME = "jobrunner-debug"
@@ -59,8 +60,10 @@ def impl_main(args=None):
     # pylint: disable=too-many-branches
     # pylint: disable=too-many-locals
     # pylint: disable=too-many-statements
-    plugins = Plugins()
-    MOD_STATE.plugins = plugins
+    # Plugin discovery is only done once per interpreter
+    if MOD_STATE.plugins is None:
+        MOD_STATE.plugins = Plugins()
+    plugins = MOD_STATE.plugins
 
     registerServices()
 
@@ -74,7 +77,14 @@ def impl_main(args=None):
         debug=options.debug)
     LOG.debug("starting with args %s", options)
     LOG.debug("python: %s", sys.version)
-    with lockedSection(jobs):
+    if options.command or options.program:
+        # The plugins' workspace lookups may be slow, get them done (and cached)
+        # before taking the lock rather than from job.resolve() below.
+        workspaceIdentity()
+        workspaceProject()
+    # The lock is held until the job is started, the child inherits it on fork
+    jobs.lock()
+    try:
         maybeHandleNonExecOptions(options, jobs)
         maybeHandleNonExecWriteOptions(options, jobs)
 
@@ -84,7 +94,7 @@ def impl_main(args=None):
         cmd = []
         if options.mail:
             oneJob = jobs.getJobMatch(options.mail[0], options.tw)
-            cmd = sendMailOrNotifyCmd(args, options.mail, options, config, oneJob)
+            cmd = sendMailOrNotifyCmd(options.mail, options, config, oneJob)
         elif options.command:
             bashCmd = postCommand(options.command)
             cmd = ["bash", "-c", bashCmd]
@@ -133,23 +143,30 @@ def impl_main(args=None):
                            reminder=options.reminder)
         job.resolve()
         job.genPersistKey()
-        jobs.active[job.key] = job
 
-    # unlocked
-    scriptName = os.path.basename(sys.argv[0])
-    if scriptName == "job" and not options.foreground:
-        childPid = os.fork()
-        if childPid > 0:
-            LOG.info("forked child %d, close %d", childPid, fd)
-            os.close(fd)
-            rc = 0
-            if options.monitor:
-                rc = monitorForkedJob(job, jobs)
-            sys.exit(rc)
+        # The job is published below, once its pid is known. The lock is held
+        # throughout (only the child keeps it after forking), so nothing can see
+        # the DB in between.
+        scriptName = os.path.basename(sys.argv[0])
+        forked = scriptName == "job" and not options.foreground
+        childPid = jobs.forkLocked() if forked else 0
+    except BaseException:
+        jobs.unlock()
+        raise
+
+    if childPid > 0:
+        # unlocked, only the child holds the lock now
+        LOG.info("forked child %d, close %d", childPid, fd)
+        os.close(fd)
+        rc = 0
+        if options.monitor:
+            rc = monitorForkedJob(job, jobs, childPid)
+        sys.exit(rc)
+    if forked:
         os.setsid()
     job.pid = os.getpid()
 
-    with lockedSection(jobs):
+    try:
         jobs.active[job.key] = job
 
         if options.mail:
@@ -180,13 +197,14 @@ def impl_main(args=None):
 
         for oldJob in depSuccess:
             k = oldJob.permKey
-            jobs.waitInactive(k, options.verbose)
+            jobs.waitInactive(k, options.verbose, oldJob.pid)
             j = jobs.inactive[k]
             if j.rc != 0:
-                out = "Dependent job failed: {}\n".format(j)
-                out += "{}\n".format(j.detail("vvv"))
-                LOG.debug("out %s", out)
-                os.write(fd, out.encode("utf-8"))
+                LOG.debug("dependent job failed %s", j)
+                os.writev(fd, [
+                    "Dependent job failed: {}\n".format(j).encode("utf-8"),
+                    "{}\n".format(j.detail("vvv")).encode("utf-8"),
+                ])
                 job.stop(jobs, STOP_DEPFAIL)
                 sprint("\nDependent job failed: %s" % j)
                 sprint("key: %s" % job.key)
@@ -200,12 +218,14 @@ def impl_main(args=None):
             sys.exit(0)
 
         assert cmd is not None
+        mailInput = None
         if options.mail:
-            cmd, inp = extendMailOrNotifyCmdLockRequired(cmd, jobs, mailDeps)
-            options.input = inp.name
+            cmd, mailInput = extendMailOrNotifyCmdLockRequired(cmd, jobs, mailDeps)
+    finally:
+        jobs.unlock()
 
     # unlocked
-    runJob(args, cmd, options, config, jobs, job, fd, doIsolate)
+    runJob(cmd, options, config, jobs, job, fd, doIsolate, mailInput)
 
 
 def main(args=None):
@@ -217,40 +237,61 @@ def main(args=None):
 
 
 def waitForDep(depWait, options, jobs):
-    while depWait:
-        dep = depWait.pop(0)
-        k = dep.permKey
-        try:
-            jobs.waitFor(dep, options.verbose)
-            jobs.waitInactive(k, options.verbose)
-        except KeyboardInterrupt:
-            LOG.info("return 1 after interrupt", exc_info=True)
-            return 1
-
-        j = jobs.inactive[k]
-        if j.rc != 0:
-            sprint("\nDependent job failed: %s" % j)
-            sprint("key: %s" % j.key)
-            sprint("return code: %d" % j.rc)
-            return j.rc
+    """Wait for all of the jobs in depWait, returning early on the first failure"""
+    pending = list(depWait)
+    announced = not options.verbose
+    try:
+        while pending:
+            stillPending = []
+            for dep in pending:
+                k = dep.permKey
+                if dep.key in jobs.active.db or not jobs.inactiveKey(k):
+                    stillPending.append(dep)
+                    continue
+                j = jobs.inactive[k]
+                if j.rc != 0:
+                    sprint("\nDependent job failed: %s" % j)
+                    sprint("key: %s" % j.key)
+                    sprint("return code: %d" % j.rc)
+                    return j.rc
+            pending = stillPending
+            if pending:
+                if not announced:
+                    announced = True
+                    sprint("\nWaiting for %s" %
+                           ", ".join("job '%s'" % dep for dep in pending))
+                safeSleep(1, jobs, [dep.pid for dep in pending if dep.pid])
+                if options.verbose:
+                    sys.stdout.write(".")
+                    sys.stdout.flush()
+    except KeyboardInterrupt:
+        LOG.info("return 1 after interrupt", exc_info=True)
+        return 1
     return 0
 
 
-def monitorForkedJob(job, jobs):
+def monitorForkedJob(job, jobs, childPid):
     monitorCmd = ["tail", "-n+0", "-f", job.logfile]
     with Popen(monitorCmd, stdout=sys.stdout, stderr=sys.stdout) as monitor:
         try:
-            active = True
-            rc = 0
-            while active:
-                LOG.debug("monitoring, sleep 0.5")
+            # Wait on our own child rather than polling the DB under the lock
+            pid, status = os.waitpid(childPid, os.WNOHANG)
+            while pid == 0:
+                LOG.debug("monitoring, wait for child %d", childPid)
+                waitForAnyPid([childPid], None)
+                pid, status = os.waitpid(childPid, os.WNOHANG)
+            try:
                 with lockedSection(jobs):
-                    active = job.key in jobs.active.db
-                    rc = None
-                    if not active:
-                        rc = jobs.inactive[job.key].rc
-                time.sleep(0.5)
-                LOG.debug("active %s, rc %r", active, rc)
+                    rc = jobs.inactive[job.key].rc
+            except KeyError:
+                # The child died before it could record the job as stopped
+                sprint("Error: job", job, "never finished", file=sys.stderr)
+                if os.WIFSIGNALED(status):
+                    return 128 + os.WTERMSIG(status)
+                return os.WEXITSTATUS(status) or 1
+            LOG.debug("child %d exited, rc %r", childPid, rc)
+            # Give the monitor a chance to show the last of the output
+            time.sleep(0.5)
             return rc
         except KeyboardInterrupt:
             LOG.debug("KeyboardInterrupt")
@@ -261,24 +302,41 @@ def monitorForkedJob(job, jobs):
         finally:
             LOG.debug("terminate monitor subprocess")
             monitor.terminate()
-            monitor.kill()
-        monitor.wait()
+            try:
+                monitor.wait(timeout=0.2)
+            except TimeoutExpired:
+                LOG.debug("kill monitor subprocess")
+                monitor.kill()
+                monitor.wait()
     return 0
 
 
-removeChars = frozenset("\x1B\x0d")
+_REMOVE_TABLE = str.maketrans("", "", "\x1B\x0d")
+_REMOVE_BYTES = b"\x1B\x0d"
 
 
-def safeWrite(fd, value):
-    value = six.text_type(value)
-    value = "".join(c for c in value if c not in removeChars)
-    fd.write(value.encode("utf-8"))
+def safeBytes(value) -> bytes:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value.translate(None, _REMOVE_BYTES))
+    return str(value).translate(_REMOVE_TABLE).encode("utf-8")
 
 
 def postCommand(cmd: List[str]) -> List[str]:
     return cmd
 
 
+def syncLog(fd: int) -> None:
+    """
+    Flush the log file data, without forcing a metadata write if possible. The
+    job is stopped afterwards either way, so a failure is only logged.
+    """
+    sync = getattr(os, "fdatasync", os.fsync)
+    try:
+        sync(fd)
+    except OSError:
+        LOG.warning("unable to sync the job log", exc_info=True)
+
+
 def finish(job, rc):
     LOG.debug("finish %s", job)
     doMsg("key:", job.key)
@@ -290,7 +348,7 @@ def finish(job, rc):
         showMsgs()
 
 
-DESC = binDescriptionWithStandardFooter("""
+DESC = """
 job - Job runner with logging
 
 Note: `.` is a common alias for any `key` argument and refers to the most recently
@@ -312,7 +370,7 @@ Examples:
 
     # Retry a job
     $ job --retry ls
-""")
+"""
 
 
 class ExitCode(Exception):
@@ -405,8 +463,7 @@ def handleNonExecOptions(options: argparse.Namespace, jobs: JobsBase):
     # pylint: disable=too-many-return-statements
     # pylint: disable=too-many-statements
     if options.version:
-        version = metadata.version("shell-jobrunner")
-        print(f"Version {version}")
+        print(f"Version {packageVersion()}")
         return True
     if options.list:
         includeReminders = len(options.list) > 1
@@ -433,14 +490,14 @@ def handleNonExecOptions(options: argparse.Namespace, jobs: JobsBase):
         if options.dot:
             sprint(dot)
         else:
-            fName = expanduser("~/output/job.svg")
-            ofile = os.path.expanduser(fName)
+            ofile = expanduser("~/output/job.svg")
             cmd = ["dot", "-Tsvg", "-o", ofile]
-            with Popen(cmd, stdout=PIPE, stderr=PIPE, stdin=PIPE) as proc:
-                stdout, stderr = proc.communicate(input=dot.encode("utf-8"))
-            if stdout.strip() or stderr.strip():
-                raise ExitCode(stdout + stderr)
-            sprint("Saved output to", fName)
+            # dot writes the svg to ofile, only stderr carries anything useful
+            with Popen(cmd, stdout=DEVNULL, stderr=PIPE, stdin=PIPE) as proc:
+                _, stderr = proc.communicate(input=dot.encode("utf-8"))
+            if stderr.strip():
+                raise ExitCode(stderr)
+            sprint("Saved output to", ofile)
         return True
     elif options.list_inactive:
         jobs.listInactive(
@@ -473,11 +530,20 @@ def handleNonExecOptions(options: argparse.Namespace, jobs: JobsBase):
             sprint(j.detail(options.verbose))
         return True
     elif options.pid:
+        matched = []
         for key in options.pid:
             try:
-                showPstreeForKey(key, jobs, options)
+                matched.append(jobs.getJobMatch(key, options.tw))
             except KeyError as error:
-                sprint("Error:", error)
+                matched.append(error)
+        # Repeated keys share a pid, check and look up each one only once
+        pids = dict.fromkeys(j.pid for j in matched if not isinstance(j, KeyError))
+        pstrees = getPstrees([pid for pid in pids if pidOk(pid)])
+        for j in matched:
+            if isinstance(j, KeyError):
+                sprint("Error:", j)
+            else:
+                showPstreeForJob(j, pstrees.get(j.pid))
         return True
     elif options.last_key:
         sprint(jobs.inactive.lastKey)
@@ -548,9 +614,9 @@ def handleNonExecWriteOptions(options, jobs: JobsBase):
             del jobs.inactive[j.key]
         return True
     elif options.set_checkpoint:
-        jobs.active.checkpoint = options.set_checkpoint
-        jobs.inactive.checkpoint = options.set_checkpoint
-        cpUtc = jobs.active.checkpoint
+        cpUtc = parseCheckpoint(options.set_checkpoint)
+        jobs.active.checkpoint = cpUtc
+        jobs.inactive.checkpoint = cpUtc
         local = cpUtc.astimezone(dateutil.tz.tzlocal())
         sprint("Set checkpoint: ", local.strftime(DATETIME_FMT))
         return True
@@ -572,59 +638,10 @@ def handleNonExecWriteOptions(options, jobs: JobsBase):
         return False
 
 
-def pidOk(pid):
-    if not pid:
-        return False
-    try:
-        os.kill(pid, 0)
-    except OSError as error:
-        if error.errno == errno.EPERM:
-            # Operation not permitted
-            return True
-        elif error.errno == errno.ESRCH:
-            # No such process
-            return False
-        else:
-            raise
-    return True
-
-
-class Pstree(object):
-    def __init__(self, text):
-        self.text = autoDecode(text).strip() if text else None
-        self.errors = []
-
-
-def getPstree(pid):
-    pstree = Pstree(None)
-    try:
-        return Pstree(check_output(["pstree", "-alpg", str(pid)]))
-    except (OSError, CalledProcessError) as error:
-        pstree.errors.append(error)
-    try:
-        return Pstree(check_output(["ps", "-fp", str(pid)]))
-    except (OSError, CalledProcessError) as error:
-        pstree.errors.append(error)
-    return pstree
-
-
-def showPstreeForKey(key, jobs, options):
-    j = jobs.getJobMatch(key, options.tw)
-    sprint("==============================================")
-    sprint(j)
-    if pidOk(j.pid):
-        pstree = getPstree(j.pid)
-        if not pstree.errors:
-            sprint(pstree.text)
-        elif pidOk(j.pid):
-            sprint("Errors getting PID info for", j.pid)
-            for err in pstree.errors:
-                sprint(err)
-        else:
-            sprint("PID not found", j.pid)
-    else:
-        sprint("PID not found", j.pid)
-    sprint("==============================================")
+@lru_cache(maxsize=1)
+def packageVersion() -> str:
+    from .compat import metadata  # pylint: disable=import-outside-toplevel
+    return metadata.version("shell-jobrunner")
 
 
 def parseArgs(args=None):
@@ -634,10 +651,26 @@ def parseArgs(args=None):
     else:
         prog = None
 
-    op = argparse.ArgumentParser(
-        prog=os.path.basename(prog) if prog else "job",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        description=DESC)
+    op = _buildParser()
+    op.prog = os.path.basename(prog) if prog else "job"
+    options = resolveBaseFlagDefaults(op.parse_args(args))
+    # Filled in here rather than as a default, the parser is cached
+    if options.to is None:
+        options.to = os.getenv("USER")
+    return options
+
+
+class _JobArgumentParser(argparse.ArgumentParser):
+    def format_help(self):
+        # The description with its standard footer is only needed for --help
+        if self.description is None:
+            self.description = binDescriptionWithStandardFooter(DESC)
+        return super().format_help()
+
+
+@lru_cache(maxsize=1)
+def _buildParser():
+    op = _JobArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter)
     op.add_argument("program", nargs="?")
     op.add_argument("args", nargs=argparse.REMAINDER)
 
@@ -689,8 +722,7 @@ def parseArgs(args=None):
         help="Send mail (notify) on job completion")
     op.add_argument("-t", "--to", metavar="ADDRESS",
                     help="Specify 'to' address for mail notification "
-                    "(default=%(default)s)",
-                    default=os.getenv("USER"))
+                    "(default=$USER)")
     op.add_argument("--cc", metavar="ADDRESS", action="append",
                     help="Specify 'CC' address for mail notification")
     op.add_argument("--tw", "--this-workspace", action="store_true",
@@ -727,9 +759,7 @@ def parseArgs(args=None):
                     "the implicit job key '.' when using -B")
 
     addNonExecOptions(op)
-
-    options = op.parse_args(args)
-    return options
+    return op
 
 
 def maybeHandle(options, jobs, handler):
@@ -755,10 +785,10 @@ def maybeHandleNonExecWriteOptions(options, jobs):
 def handleIsolate(cmd):
     isolateName = keyEscape(" ".join(cmd))
     if len(isolateName) > 45:
-        hashVal = hashlib.new("md5")
-        for char in cmd:
-            hashVal.update(char.encode("raw_unicode_escape"))
-        isolateName = hashVal.hexdigest()[:16]
+        # No separator, to keep the names of existing isolated jobs unchanged
+        import hashlib  # pylint: disable=import-outside-toplevel
+        isolateName = hashlib.md5(
+            "".join(cmd).encode("raw_unicode_escape")).hexdigest()[:16]
     netnsd = ["isolate", "-n", isolateName]
     netnsd += cmd
     LOG.info("Isolating command %r -> %r", cmd, netnsd)
@@ -766,7 +796,6 @@ def handleIsolate(cmd):
 
 
 def sendMailOrNotifyCmd(
-        args: Optional[List[str]],
         notifyArg: List[str],
         options: argparse.Namespace,
         config: Config,
@@ -788,7 +817,7 @@ def sendMailOrNotifyCmd(
     if config.mailProgram == "chatmail":
         # Special case for built-in chatmail, which should inherit any of the
         # base args given to job, such as which rc file to use, etc.
-        cmd.extend(baseParsedArgsToArgList(args or sys.argv, options))
+        cmd.extend(baseParsedArgsToArgList(options))
     cmd.append(options.to)
     return cmd
 
@@ -797,11 +826,10 @@ def extendMailOrNotifyCmdLockRequired(
         cmd: List[str],
         jobs: JobsBase,
         mailDeps: List[JobInfo],
-) -> Tuple[List[str], IO]:
-    # Collect output files as attachments from dep jobs
-    # pylint: disable=consider-using-with
-    tmp = tempfile.NamedTemporaryFile(prefix="jobInfo-")
-    inp = tmp
+) -> Tuple[List[str], bytes]:
+    # Collect output files as attachments from dep jobs, and return the mail body
+    # which is fed to the mail program on stdin.
+    body: List[bytes] = []
     mailSize = 0
 
     # Remove "to" address temporarily
@@ -809,33 +837,36 @@ def extendMailOrNotifyCmdLockRequired(
     lastArg = cmd.pop(-1)
     for j in mailDeps:
         depJob = jobs.inactive[j.permKey]
-        safeWrite(tmp, depJob.detail())
-        safeWrite(tmp, "\n" + SPACER_EACH + "\n")
+        body.append(f"{depJob.detail()}\n{SPACER_EACH}\n".encode("utf-8"))
         assert depJob.logfile
-        out = check_output(["tail", "-n20", depJob.logfile])
-        try:
-            lines = autoDecode(out)
-        except ValueError as err:
-            LOG.debug("error decoding output from log file %r for %s: %s",
-                      depJob.logfile, depJob, err)
-            lines = f"{out[:50]}\n"
-        safeWrite(tmp, lines)
-        safeWrite(tmp, SPACER_EACH + "\n")
-        safeWrite(tmp, "\n")
         try:
             stat = os.stat(depJob.logfile)
         except OSError:
-            continue
-        if (mailSize + stat.st_size * 4 / 3) < 8 * 1024 * 1024:
+            LOG.debug("no log file %r for %s", depJob.logfile, depJob, exc_info=True)
+            stat = None
+        out = b""
+        if stat is not None and stat.st_size:
+            out = tailLines(depJob.logfile, 20)
+        if out.isascii():
+            # Nothing to transcode, the usual case
+            body.append(out)
+        else:
+            try:
+                lines = autoDecode(out)
+            except ValueError as err:
+                LOG.debug("error decoding output from log file %r for %s: %s",
+                          depJob.logfile, depJob, err)
+                lines = f"{out[:50]}\n"
+            body.append(lines.encode("utf-8"))
+        body.append(f"{SPACER_EACH}\n\n".encode("utf-8"))
+        if stat is not None and (mailSize + stat.st_size * 4 / 3) < 8 * 1024 * 1024:
             mailSize += stat.st_size
             cmd += ["-a", depJob.logfile]
-    tmp.flush()
     cmd.append(lastArg)
-    return cmd, inp
+    return cmd, safeBytes(b"".join(body))
 
 
 def runJob(
-        args: List[str],
         cmd: List[str],
         options: argparse.Namespace,
         config: Config,
@@ -843,21 +874,24 @@ def runJob(
         job: JobInfo,
         fd: int,
         doIsolate: bool,
+        inputData: Optional[bytes] = None,
 ) -> None:
     # pylint: disable=too-many-arguments
     # pylint: disable=too-many-statements
     LOG.info("execute: %s", job.cmdStr)
     doMsg("execute:", job.cmdStr)
     robotInfo("execute", {"key": job.key}, {"command": job.cmdStr})
-    fpIn = encoding_open(options.input, "r")
+    # Input is either the mail body collected in memory, or the --input file
+    fpIn = encoding_open(options.input, "r") if inputData is None else None
     rc = -1
     if doIsolate:
         cmd = handleIsolate(cmd)
 
     try:
-        LOG.debug("starting check_call()")
-        rc = check_call(cmd, stdin=fpIn, stdout=fd, stderr=fd)
-        LOG.debug("check_call() => rc=%d", rc)
+        LOG.debug("starting run()")
+        rc = run(cmd, stdin=fpIn, input=inputData, stdout=fd, stderr=fd,
+                 check=True).returncode
+        LOG.debug("run() => rc=%d", rc)
     except KeyboardInterrupt:
         LOG.debug("KeyboardInterrupt", exc_info=True)
         sprint("\ninterrupted")
@@ -875,32 +909,33 @@ def runJob(
         raise
     finally:
         LOG.debug("stop job, it has finished %s", job, exc_info=True)
+        # The log file is independent of the DB, flush it before taking the lock
+        syncLog(fd)
         with lockedSection(jobs):
             LOG.debug("locked DB, writing 'stop' status rc=%d", rc)
             job.stop(jobs, rc)
-            os.fsync(fd)
             LOG.debug("locked DB, writing 'finish' status rc=%d", rc)
             finish(job, rc)
             LOG.debug("unlocked, should now exit rc=%d", rc)
 
     if options.notify:
-        notifyCmd = sendMailOrNotifyCmd(args, [], options, config, job)
+        notifyCmd = sendMailOrNotifyCmd([], options, config, job)
         with lockedSection(jobs):
-            notifyCmd, inp = extendMailOrNotifyCmdLockRequired(
+            notifyCmd, notifyInput = extendMailOrNotifyCmdLockRequired(
                 notifyCmd,
                 jobs,
                 [job],
             )
-        fpIn = encoding_open(inp.name, "r")
         try:
             LOG.debug("running notifyCmd %r", notifyCmd)
-            notifyRc = check_call(
+            notifyRc = run(
                 notifyCmd,
-                stdin=fpIn,
+                input=notifyInput,
                 stdout=DEVNULL,
                 stderr=DEVNULL,
-            )
-            LOG.debug("check_call() => rc=%d", notifyRc)
+                check=True,
+            ).returncode
+            LOG.debug("run() => rc=%d", notifyRc)
         except Exception as err:  # pylint: disable=broad-except
             sprint("Notification error:", err, file=sys.stderr)
             LOG.debug("General exception (ignored)", exc_info=True)
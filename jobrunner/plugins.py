@@ -22,12 +22,15 @@ All of these functions are optional. If the plugin cannot provide a sensible val
 for the current execution then it should raise NotImplementedError so that the next
 plugin at a possibly lower priority will get called instead.
 """
+from functools import lru_cache
 import importlib
 import logging
-from operator import attrgetter
+from operator import attrgetter, itemgetter
 import pkgutil
 import socket
-from typing import Tuple
+import threading
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
 import warnings
 
 import jobrunner.plugin
@@ -39,60 +42,125 @@ PRIO_LOWEST = 1 << 31
 PRIO_HIGHEST = 0
 
 
+# The plugin modules and their priorities are the same for every Plugins instance,
+# so they are only discovered once per interpreter.
+_DISCOVERED: Optional[Tuple[List[ModuleType], Dict[str, Dict[str, int]]]] = None
+_DISCOVERY_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=1)
 def gethostname() -> str:
     return socket.gethostname()
 
 
-class Plugins(object):
-    def __init__(self):
-        plugins = {plug.load() for plug in get_plugins("wwade.jobrunner")}
-        deprecatedPlugins = {
+def _discoverPlugins() -> Tuple[List[ModuleType], Dict[str, Dict[str, int]]]:
+    global _DISCOVERED  # pylint: disable=global-statement
+    with _DISCOVERY_LOCK:
+        if _DISCOVERED is not None:
+            return _DISCOVERED
+        # dict keys drop duplicate modules while keeping the discovery order
+        plugins = dict.fromkeys(
+            plug.load() for plug in get_plugins("wwade.jobrunner"))
+        deprecatedPlugins = [
             importlib.import_module("jobrunner.plugin.{}".format(name))
             for _, name, _
             in pkgutil.iter_modules(jobrunner.plugin.__path__)
-        }
+        ]
         if deprecatedPlugins:
             warnings.warn("Found old-style plugins in jobrunner.plugin: %r. "
-                          "Convert to entry_point 'wwade.jobrunner'" % list(
-                              deprecatedPlugins),
+                          "Convert to entry_point 'wwade.jobrunner'" %
+                          deprecatedPlugins,
                           DeprecationWarning)
-        plugins |= deprecatedPlugins
-        self.plugins = list(sorted(plugins, key=attrgetter("__name__")))
-        logger.debug("all plugins: %r", [p.__name__ for p in self.plugins])
-        self._prio = {}
-        for plugin in self.plugins:
+            plugins.update(dict.fromkeys(deprecatedPlugins))
+        # Name order is the tie-break between plugins with equal priority
+        sortedPlugins = sorted(plugins, key=attrgetter("__name__"))
+        logger.debug("all plugins: %r", [p.__name__ for p in sortedPlugins])
+        prio = {}
+        for plugin in sortedPlugins:
             if hasattr(plugin, "priority"):
-                self._prio[plugin.__name__] = plugin.priority()
+                prio[plugin.__name__] = plugin.priority()
+        _DISCOVERED = (sortedPlugins, prio)
+        return _DISCOVERED
 
-    def _pluginCalls(self, func, *args, **kwargs):
-        prio = {}
-        for plugin in self.plugins:
-            if hasattr(plugin, func):
-                pluginPrioMap = self._prio.get(plugin.__name__, {})
-                pval = pluginPrioMap.get(func, pluginPrioMap.get("", PRIO_LOWEST))
-                prio.setdefault(pval, []).append(plugin)
 
-        if not prio:
-            return
+def resetPluginDiscovery() -> None:
+    """Forget the discovered plugins, so that the next lookup finds them again"""
+    global _DISCOVERED  # pylint: disable=global-statement
+    with _DISCOVERY_LOCK:
+        _DISCOVERED = None
 
-        for prio, plugins in sorted(prio.items()):
-            for plugin in plugins:
-                name = plugin.__name__
-                try:
-                    result = getattr(plugin, func)(*args, **kwargs)
-                    logger.debug("%r: yield plugin %s => %r", prio, name, result)
-                    yield result
-                except NotImplementedError:
-                    logger.debug("%r: plugin %s NotImplementedError", prio, name)
+
+class Plugins(object):
+    def __init__(self):
+        # Discovery is deferred until a plugin function is actually needed, so
+        # that commands which never consult the plugins don't pay for it.
+        self._plugins = None
+        self._prio = {}
+        self._dispatch = {}
+
+    @property
+    def plugins(self):
+        if self._plugins is None:
+            self._load()
+        return self._plugins
+
+    def _load(self):
+        self._plugins, self._prio = _discoverPlugins()
+
+    def _dispatchFor(self, func):
+        """
+        The (priority, function, plugin name) implementations of func, ordered by
+        priority then plugin name
+        """
+        calls = self._dispatch.get(func)
+        if calls is None:
+            calls = []
+            for plugin in self.plugins:
+                call = getattr(plugin, func, None)
+                if call is None:
                     continue
+                name = plugin.__name__
+                prioMap = self._prio.get(name, {})
+                pval = prioMap.get(func, prioMap.get("", PRIO_LOWEST))
+                calls.append((pval, call, name))
+            # Stable sort, plugins are already in name order
+            calls.sort(key=itemgetter(0))
+            self._dispatch[func] = calls
+        return calls
+
+    def _pluginCalls(self, func, *args, **kwargs):
+        for prio, call, name in self._dispatchFor(func):
+            try:
+                result = call(*args, **kwargs)
+                logger.debug("%r: yield plugin %s => %r", prio, name, result)
+                yield result
+            except NotImplementedError:
+                logger.debug("%r: plugin %s NotImplementedError", prio, name)
+                continue
+
+    def _firstPluginResult(self, func, accept):
+        """
+        Call the implementations of func in priority order and return the first
+        result for which accept(result) is true, or None
+        """
+        for prio, call, name in self._dispatchFor(func):
+            try:
+                result = call()
+            except NotImplementedError:
+                logger.debug("%r: plugin %s NotImplementedError", prio, name)
+                continue
+            logger.debug("%r: plugin %s => %r", prio, name, result)
+            if accept(result):
+                return result
+        return None
 
     def getResources(self, jobs):
         return "".join(self._pluginCalls("getResources", jobs))
 
     def workspaceIdentity(self):
-        for ret in self._pluginCalls("workspaceIdentity"):
-            if ret:
-                return ret
+        ret = self._firstPluginResult("workspaceIdentity", bool)
+        if ret:
+            return ret
         logger.debug("using gethostname as fallback for workspaceIdentity")
         return gethostname()
 
@@ -101,7 +169,7 @@ class Plugins(object):
         If the current context has a notion of a "project name", return the project
         name as well as a bool True to indicate that the plugin is authoritative.
         """
-        for (ret, ok) in self._pluginCalls("workspaceProject"):
-            if ok:
-                return ret, ok
+        ret = self._firstPluginResult("workspaceProject", itemgetter(1))
+        if ret:
+            return ret
         return "", False
@@ -0,0 +1,36 @@
+from __future__ import absolute_import, division, print_function
+
+import argparse
+
+import pytest
+
+from jobrunner.argparse import (
+    addArgumentParserBaseFlags,
+    baseParsedArgsToArgList,
+    resolveBaseFlagDefaults,
+)
+
+
+@pytest.mark.parametrize(("argv", "expected"), [
+    ([], []),
+    (["-v", "--debug"], ["-v", "--debug"]),
+    (["--state-dir", "/x", "--rc-file", "/y"],
+     ["--state-dir", "/x", "--rc-file", "/y"]),
+    (["-d", "/x", "--debugLocking"], ["--state-dir", "/x", "--debugLocking"]),
+    (["--rc-file=/y"], ["--rc-file", "/y"]),
+])
+def testBaseParsedArgsToArgList(argv, expected):
+    parser = argparse.ArgumentParser()
+    addArgumentParserBaseFlags(parser, "test-debug")
+    assert expected == baseParsedArgsToArgList(parser.parse_args(argv))
+
+
+def testResolveBaseFlagDefaults(monkeypatch):
+    parser = argparse.ArgumentParser()
+    addArgumentParserBaseFlags(parser, "test-debug")
+    monkeypatch.setenv("JOBRUNNER_STATE_DIR", "/env")
+    args = resolveBaseFlagDefaults(parser.parse_args([]))
+    assert args.stateDir == "/env"
+    assert not baseParsedArgsToArgList(args)
+    args = resolveBaseFlagDefaults(parser.parse_args(["-d", "/x"]))
+    assert args.stateDir == "/x"
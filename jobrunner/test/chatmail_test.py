@@ -5,7 +5,6 @@ from unittest import TestCase
 
 from mock import ANY, MagicMock, call, patch
 import requests
-import six
 
 from jobrunner.config import CHATMAIL_AT_ALL
 from jobrunner.mail import chat
@@ -86,7 +85,7 @@ class ChatTest(TestCase):
             self._doBaseSetup()
 
     def assertMultilineRegexpMatches(self, text, regexp):
-        six.assertRegex(self, text, re.compile(regexp, flags=re.S))
+        self.assertRegex(text, re.compile(regexp, flags=re.S))
 
     def assertPostTextMatchesRegexp(self, regexp, callIdx=0):
         # pylint: disable-msg=no-member
@@ -5,7 +5,6 @@ import tempfile
 import unittest
 
 from mock import MagicMock, patch
-import six
 
 from jobrunner import config
 
@@ -69,12 +68,12 @@ class TestRcParser(unittest.TestCase, TestMixin):
 
         if gChatUserHookDict is None:
             gChatUserHookDict = {}
-        for user, hook in six.iteritems(gChatUserHookDict):
+        for user, hook in gChatUserHookDict.items():
             self.assertEqual(hook, cfgObj.gChatUserHook(user))
 
         if gChatUserIdDict is None:
             gChatUserIdDict = {}
-        for user, uid in six.iteritems(gChatUserIdDict):
+        for user, uid in gChatUserIdDict.items():
             self.assertEqual(uid, cfgObj.gChatUserId(user))
 
     def testNoFile(self):
@@ -117,7 +116,7 @@ class TestMalformedRcFile(unittest.TestCase, TestMixin):
             tempFp.write(EXAMPLE_RCFILE + BAD_SECTION)
             tempFp.flush()
             pattern = r"unknown configuration sections: unknown"
-            with six.assertRaisesRegex(self, config.ConfigError, pattern):
+            with self.assertRaisesRegex(config.ConfigError, pattern):
                 self.config(tempFp)
 
     def testBadOption(self):
@@ -125,7 +124,7 @@ class TestMalformedRcFile(unittest.TestCase, TestMixin):
             tempFp.write(EXAMPLE_RCFILE + "\n" + "xyz = foo\n")
             tempFp.flush()
             pattern = r'unknown configuration options in section "mail": xyz'
-            with six.assertRaisesRegex(self, config.ConfigError, pattern):
+            with self.assertRaisesRegex(config.ConfigError, pattern):
                 self.config(tempFp)
 
     def testReminderBadOption(self):
@@ -136,5 +135,5 @@ class TestMalformedRcFile(unittest.TestCase, TestMixin):
                 r'RC file has invalid "ui.watch reminder" setting foo.\s*' +
                 r"Valid options: (full, summary|summary, full)"
             )
-            with six.assertRaisesRegex(self, config.ConfigError, pattern):
+            with self.assertRaisesRegex(config.ConfigError, pattern):
                 self.config(tempFp)
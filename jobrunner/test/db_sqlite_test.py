@@ -1,21 +1,23 @@
 from __future__ import absolute_import, division, print_function
 
+import fcntl
+import json
 import os
-from tempfile import NamedTemporaryFile
+import sqlite3
+from tempfile import NamedTemporaryFile, TemporaryDirectory
 import unittest
+from unittest import mock
 
-from six import assertCountEqual
-
-from jobrunner.db.sqlite_db import Sqlite3KeyValueStore, connectDb
+from jobrunner.db.sqlite_db import Sqlite3Jobs, Sqlite3KeyValueStore, connectDb
 
 
 class KeyValueStoreTest(unittest.TestCase):
     cached = False
 
-    def store(self, filename=":memory:", ver="0"):
+    def store(self, filename=":memory:", ver="0", cacheKeys=False):
         self.removeStore()
         conn = connectDb(filename)
-        store = Sqlite3KeyValueStore("myTable", ver)
+        store = Sqlite3KeyValueStore("myTable", ver, cacheKeys)
         store.setup(conn)
         store.conn = conn
         store.lock()
@@ -38,9 +40,9 @@ class KeyValueStoreTest(unittest.TestCase):
 
     def testKeys(self):
         store = self.store()
-        assertCountEqual(self, store.initvals, list(store.keys()))
+        self.assertCountEqual(store.initvals, list(store.keys()))
         store["foo"] = "value"
-        assertCountEqual(self, list(store.initvals) + ["foo"], list(store.keys()))
+        self.assertCountEqual(list(store.initvals) + ["foo"], list(store.keys()))
 
     def testLen(self):
         store = self.store()
@@ -60,6 +62,63 @@ class KeyValueStoreTest(unittest.TestCase):
         del store["foo"]
         self.assertNotIn("foo", store)
 
+    def testCachedKeys(self):
+        store = self.store(cacheKeys=True)
+        # Single membership tests query the table until keys() has been read
+        store.conn.execute("INSERT INTO myTable VALUES ('baz', '2')")
+        self.assertIn("baz", store)
+        store.keys()
+        self.assertNotIn("foo", store)
+        store["foo"] = "0"
+        self.assertIn("foo", store)
+        del store["foo"]
+        self.assertNotIn("foo", store)
+        store.conn.execute("INSERT INTO myTable VALUES ('bar', '1')")
+        self.assertNotIn("bar", store)
+        store.unlock()
+        store.lock()
+        self.assertIn("bar", store)
+
+    def testUnchangedValueNotRewritten(self):
+        store = self.store()
+        store["foo"] = "0"
+        changes = store.conn.total_changes
+        store["foo"] = "0"
+        self.assertEqual(changes, store.conn.total_changes)
+        store["foo"] = "1"
+        self.assertEqual(changes + 1, store.conn.total_changes)
+        self.assertEqual("1", store["foo"])
+
+    def testSetWithoutUpsert(self):
+        with mock.patch.object(sqlite3, "sqlite_version_info", (3, 23, 0)):
+            store = self.store()
+        store["foo"] = "0"
+        store["foo"] = "1"
+        self.assertEqual("1", store["foo"])
+
+    def testDeleteKeys(self):
+        store = self.store(cacheKeys=True)
+        store["foo"] = "0"
+        store["bar"] = "1"
+        store["baz"] = "2"
+        self.assertIn("foo", store)
+        self.assertEqual(2, store.deleteKeys(["foo", "baz", "missing"]))
+        self.assertNotIn("foo", store)
+        self.assertNotIn("baz", store)
+        self.assertEqual("1", store["bar"])
+        self.assertCountEqual(list(store.initvals) + ["bar"], store.keys())
+
+    def testIncrement(self):
+        for version in (sqlite3.sqlite_version_info, (3, 34, 0)):
+            with mock.patch.object(sqlite3, "sqlite_version_info", version):
+                store = self.store(cacheKeys=True)
+                self.assertNotIn("idx", store)
+                self.assertEqual(0, store.increment("idx"))
+                self.assertIn("idx", store)
+                self.assertEqual(1, store.increment("idx"))
+                self.assertEqual(2, store.increment("idx"))
+                self.assertEqual(3, json.loads(store["idx"]))
+
     def testWrongVersion(self):
         with NamedTemporaryFile(delete=False) as tempf:
             tempf.close()
@@ -82,3 +141,71 @@ class KeyValueStoreTest(unittest.TestCase):
         store = self.store(fname, "1")
         self.assertNotIn("foo", store)
         os.unlink(fname)
+
+
+class ForkLockedTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpDir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        dbDir = self._tmpDir.name
+        self.config = mock.Mock(dbDir=dbDir, lockFile=os.path.join(dbDir, ".lockdb"))
+        self.jobs = Sqlite3Jobs(self.config, None)
+
+    def tearDown(self):
+        if self.jobs.isLocked():
+            self.jobs.unlock()
+        self._tmpDir.cleanup()
+
+    def flockHeldElsewhere(self):
+        with open(self.config.lockFile, "a", encoding="utf-8") as lockFile:
+            try:
+                fcntl.flock(lockFile, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(lockFile, fcntl.LOCK_UN)
+            return False
+
+    def testForkLocked(self):
+        self.jobs.lock()
+        self.jobs.active.db["parent"] = "0"
+        readFd, writeFd = os.pipe()
+        pid = self.jobs.forkLocked()
+        if pid == 0:
+            rc = 1
+            try:
+                os.close(writeFd)
+                os.read(readFd, 1)
+                if self.jobs.isLocked():
+                    self.jobs.inactive.db["child"] = "1"
+                    self.jobs.unlock()
+                    rc = 0
+            finally:
+                os._exit(rc)  # pylint: disable=protected-access
+        os.close(readFd)
+        # The parent has let go of the lock, but the child still holds it
+        self.assertFalse(self.jobs.isLocked())
+        self.assertIsNone(self.jobs.active.conn)
+        self.assertTrue(self.flockHeldElsewhere())
+        os.close(writeFd)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(0, status)
+        self.assertFalse(self.flockHeldElsewhere())
+
+        # Both the write made before the fork and the child's are committed
+        self.jobs.lock()
+        self.assertEqual("0", self.jobs.active.db["parent"])
+        self.assertEqual("1", self.jobs.inactive.db["child"])
+
+    def testForkLockedForkFails(self):
+        self.jobs.lock()
+        self.jobs.active.db["before"] = "0"
+        with mock.patch("os.fork", side_effect=OSError(11, "EAGAIN")):
+            with self.assertRaises(OSError):
+                self.jobs.forkLocked()
+        self.assertTrue(self.jobs.isLocked())
+        self.assertTrue(self.flockHeldElsewhere())
+        self.jobs.active.db["after"] = "1"
+        self.jobs.unlock()
+
+        self.jobs.lock()
+        self.assertEqual("0", self.jobs.active.db["before"])
+        self.assertEqual("1", self.jobs.active.db["after"])
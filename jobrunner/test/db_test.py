@@ -0,0 +1,24 @@
+from __future__ import absolute_import, division, print_function
+
+from datetime import datetime
+
+from dateutil.tz import tzutc
+import pytest
+
+from jobrunner.db import parseCheckpoint
+
+
+@pytest.mark.parametrize("value", [
+    "2020-03-04T05:06:07+00:00",
+    "2020-03-04 05:06:07Z",
+    "Mar 4 2020 05:06:07 UTC",
+    datetime(2020, 3, 4, 5, 6, 7, tzinfo=tzutc()),
+])
+def testParseCheckpoint(value):
+    expected = datetime(2020, 3, 4, 5, 6, 7, tzinfo=tzutc())
+    assert parseCheckpoint(value) == expected
+
+
+def testParseCheckpointInvalid():
+    with pytest.raises(ValueError):
+        parseCheckpoint(1234)
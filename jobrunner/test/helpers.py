@@ -1,11 +1,10 @@
 from __future__ import absolute_import, division, print_function
 
 from contextlib import contextmanager
+from io import StringIO
 import os
 import sys
 
-from six.moves import StringIO
-
 HOSTNAME = 'host.example.com'
 HOME = '/home/me'
 USER = 'me'
@@ -6,7 +6,6 @@ import os
 import unittest
 
 import mock
-import six
 
 from jobrunner import db, info, plugins, utils
 from jobrunner.service.registry import registerServices
@@ -50,8 +49,8 @@ class TestJobInfoJson(unittest.TestCase):
     def cmpObj(self, objA, objB):
         print(objA.detail(3 * ["v"]))
         print(objB.detail(3 * ["v"]))
-        six.assertCountEqual(self, list(objA.__dict__.keys()),
-                             list(objA.__dict__.keys()))
+        self.assertCountEqual(list(objA.__dict__.keys()),
+                              list(objA.__dict__.keys()))
         for key in objA.__dict__:
             if key == "_parent":
                 continue
@@ -83,13 +82,13 @@ class TestReminder(unittest.TestCase):
         out1 = job.detail([])
         print(out1)
         self.assertEqual(outDetail1, out1)
-        six.assertRegex(self, out1, r"\nReminder\s+This is a reminder\n")
+        self.assertRegex(out1, r"\nReminder\s+This is a reminder\n")
         self.assertNotIn("\nState ", out1)
         job.stop(job.parent, utils.STOP_DONE)
         out2 = job.detail("vvv")
-        six.assertRegex(self, out2, r"\nReminder\s+This is a reminder\n")
-        six.assertRegex(self,
-                        out2, r"\nState\s+Finished \(Completed Reminder\)\n")
+        self.assertRegex(out2, r"\nReminder\s+This is a reminder\n")
+        self.assertRegex(
+            out2, r"\nState\s+Finished \(Completed Reminder\)\n")
         print(out2)
 
 
@@ -5,8 +5,6 @@ import os.path
 import sys
 import time
 
-from six.moves import range
-
 
 def main():
     fileName = sys.argv[1]
@@ -12,7 +12,6 @@ from unittest import TestCase
 from pexpect import EOF
 from pexpect.exceptions import TIMEOUT
 import pytest
-import six
 
 from jobrunner.utils import autoDecode
 
@@ -268,7 +267,7 @@ class RunExecOptionsTest(TestCase):
             """
             reg = re.compile(matchOut.format(sep=sep),
                              re.MULTILINE | re.VERBOSE)
-            six.assertRegex(self, out, reg)
+            self.assertRegex(out, reg)
 
     def testMonitor(self):
         # --monitor
@@ -421,7 +420,7 @@ class RunNonExecOptionsTest(TestCase):
             self.assertIn("echo second", listInactive)
             listInactiveVerbose = job("--list-inactive", "-v")
             progEchoRe = re.compile(r"^Command \s*echo second$", re.M)
-            six.assertRegex(self, listInactiveVerbose, progEchoRe)
+            self.assertRegex(listInactiveVerbose, progEchoRe)
             # -vvv
             subEnv = dict(os.environ)
             subEnv.update({"INACTIVE_EXTRA_VERBOSE": "0123\x07123\n"})
@@ -434,7 +433,7 @@ class RunNonExecOptionsTest(TestCase):
                 listInactiveExtraVerbose)
 
             # --show
-            six.assertRegex(self, job("--show", secondKey), progEchoRe)
+            self.assertRegex(job("--show", secondKey), progEchoRe)
             # --info
             self.assertIn("activeJobs", job("--info"))
 
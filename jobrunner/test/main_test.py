@@ -4,9 +4,19 @@
 
 from __future__ import absolute_import, division, print_function
 
+import os
+from unittest import mock
+
 import pytest
 
-from jobrunner.main import handleIsolate
+from jobrunner.main import (
+    _buildParser,
+    handleIsolate,
+    monitorForkedJob,
+    parseArgs,
+    safeBytes,
+    syncLog,
+)
 
 long1 = ['long'] * 10
 long2 = [u'long\u2031\x23\x33\x44'] * 10
@@ -20,3 +30,49 @@ long2 = [u'long\u2031\x23\x33\x44'] * 10
 def testHandleIsolate(cmd, expected):
     isolated = handleIsolate(cmd)
     assert expected == isolated
+
+
+@pytest.mark.parametrize('value', [
+    'a\x1b[0mb\r\n',
+    b'a\x1b[0mb\r\n',
+])
+def testSafeBytes(value):
+    assert safeBytes(value) == b'a[0mb\n'
+
+
+def testMonitorForkedJobNeverFinished(tmp_path, capfd):
+    logfile = tmp_path / 'log'
+    logfile.touch()
+    job = mock.Mock(key='key', logfile=str(logfile))
+    jobs = mock.MagicMock(inactive={})
+    childPid = os.fork()
+    if childPid == 0:
+        os._exit(3)  # pylint: disable=protected-access
+    assert monitorForkedJob(job, jobs, childPid) == 3
+    assert 'never finished' in capfd.readouterr().err
+
+
+def testParseArgsStateDirFromEnv(monkeypatch):
+    monkeypatch.setenv('JOBRUNNER_STATE_DIR', '/first')
+    assert parseArgs(['ls']).stateDir == '/first'
+    monkeypatch.setenv('JOBRUNNER_STATE_DIR', '/second')
+    assert parseArgs(['ls']).stateDir == '/second'
+
+
+def testParseArgsToFromEnv(monkeypatch):
+    monkeypatch.setenv('USER', 'first')
+    assert parseArgs(['ls']).to == 'first'
+    monkeypatch.setenv('USER', 'second')
+    assert parseArgs(['ls']).to == 'second'
+    assert parseArgs(['-t', 'other', 'ls']).to == 'other'
+
+
+def testHelpDescription():
+    helpText = _buildParser().format_help()
+    assert 'job - Job runner with logging' in helpText
+    assert 'Configuration:' in helpText
+
+
+def testSyncLogError():
+    with mock.patch('os.fdatasync', side_effect=OSError(5, 'EIO'), create=True):
+        syncLog(-1)
@@ -9,6 +9,13 @@ import jobrunner.plugins
 logger = logging.getLogger(__name__)
 
 
+@pytest.fixture(autouse=True)
+def resetPlugins():
+    jobrunner.plugins.resetPluginDiscovery()
+    yield
+    jobrunner.plugins.resetPluginDiscovery()
+
+
 class Plugin:
     @classmethod
     def load(cls):
@@ -104,3 +111,14 @@ def testPluginPriorities(plugins, workspaceProject, resources):
 
         logger.info("all plugins implement workspaceProject()")
         assert (workspaceProject, True) == p.workspaceProject()
+
+
+def testPluginDiscoveryShared():
+    with mock.patch("jobrunner.plugins.get_plugins") as gp, \
+            mock.patch("importlib.import_module") as im:
+        im.return_value = []
+        gp.return_value = {PluginAAANoPrio, PluginMMMLowPrio}
+
+        assert ("low", True) == jobrunner.plugins.Plugins().workspaceProject()
+        assert ("low", True) == jobrunner.plugins.Plugins().workspaceProject()
+        gp.assert_called_once()
@@ -6,10 +6,28 @@ from __future__ import absolute_import, division, print_function
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+import subprocess
 
+from dateutil.tz import tzutc
+import mock
 import pytest
 
-from jobrunner.utils import autoDecode, humanTimeDeltaSecs
+from jobrunner import plugins
+from jobrunner.utils import (
+    MOD_STATE,
+    autoDecode,
+    dateTimeFromJson,
+    dateTimeToJson,
+    humanTimeDeltaSecs,
+    tailLines,
+    workspaceIdentity,
+)
+
+
+def testDateTimeJson():
+    now = datetime(2020, 3, 4, 5, 6, 7, 890, tzinfo=tzutc())
+    assert dateTimeFromJson(dateTimeToJson(now)) == now
+    assert dateTimeFromJson(None) is None
 
 
 @pytest.mark.parametrize(("value", "encoding"), [
@@ -21,6 +39,35 @@ def testAutoDecode(value, encoding):
     assert value.decode(encoding) == autoDecode(value)
 
 
+@pytest.mark.parametrize("content", [
+    b"",
+    b"\n",
+    b"one line",
+    b"one\ntwo\n",
+    b"".join(b"line %d\n" % i for i in range(100)),
+    b"".join(b"line %d\n" % i for i in range(100)) + b"no newline",
+    b"\n\n\n" * 10,
+])
+@pytest.mark.parametrize("blockSize", [1, 7, 8192])
+def testTailLines(tmp_path, content, blockSize):
+    logFile = tmp_path / "log"
+    logFile.write_bytes(content)
+    expected = subprocess.check_output(["tail", "-n20", str(logFile)])
+    assert expected == tailLines(str(logFile), 20, blockSize)
+
+
+def testWorkspaceIdentityCached(tmp_path, monkeypatch):
+    mockPlug = mock.MagicMock(plugins.Plugins)
+    mockPlug.workspaceIdentity.side_effect = ["ws1", "ws2"]
+    # Setting plugins clears the workspace cache, and so does the undo
+    monkeypatch.setattr(MOD_STATE, "plugins", mockPlug)
+    assert workspaceIdentity() == "ws1"
+    assert workspaceIdentity() == "ws1"
+    monkeypatch.chdir(tmp_path)
+    assert workspaceIdentity() == "ws2"
+    assert mockPlug.workspaceIdentity.call_count == 2
+
+
 @dataclass(frozen=True)
 class HTDCase:
     delta: timedelta
@@ -5,17 +5,14 @@ import errno
 import fcntl
 import logging
 import os
+import select
 import signal
 import subprocess
 import sys
-import tempfile
 import time
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
-import chardet
 import dateutil.tz
-from six import text_type
-from six.moves import map, range
 
 from .compat import encoding_open
 from .plugins import Plugins
@@ -28,15 +25,19 @@ STOP_DONE = -1002
 STOP_DEPFAIL = -1003
 SPECIAL_STATUS = [STOP_STOP, STOP_ABORT, STOP_DONE, STOP_DEPFAIL]
 
+PID_POLL_INTERVAL = 0.5
+PSTREE_WORKERS = 4
+
 SPACER_EACH = "========================================"
 SPACER = SPACER_EACH + SPACER_EACH
 
 LOG = logging.getLogger(__name__)
+_UTC = dateutil.tz.tzutc()
 
 
 def strForEach(value):
     try:
-        return text_type(value)
+        return str(value)
     except (UnicodeDecodeError, UnicodeEncodeError):
         LOG.debug("%r", value, exc_info=True)
         return f"{value!r}"
@@ -59,6 +60,8 @@ def sprint(*args, **kwargs):
 class ModState(object):
     def __init__(self) -> None:
         self._plugins: Optional[Plugins] = None
+        # Plugin answers about the workspace, by (query, cwd)
+        self.workspaceCache: Dict[Tuple[str, str], Any] = {}
 
     @property
     def plugins(self) -> Optional[Plugins]:
@@ -67,6 +70,7 @@ class ModState(object):
     @plugins.setter
     def plugins(self, plugins: Plugins) -> None:
         self._plugins = plugins
+        self.workspaceCache.clear()
 
 
 MOD_STATE = ModState()
@@ -116,7 +120,7 @@ def unlocked(func):
 
 
 def utcNow():
-    return datetime.datetime.utcnow().replace(tzinfo=dateutil.tz.tzutc())
+    return datetime.datetime.utcnow().replace(tzinfo=_UTC)
 
 
 class FileLock(object):
@@ -162,9 +166,8 @@ def dateTimeToJson(dtObj):
 def dateTimeFromJson(dtJson):
     if dtJson is None:
         return None
-    args = list(dtJson)
-    args.append(dateutil.tz.tzutc())
-    return datetime.datetime(*args)
+    # Every job decoded from the DB goes through here for each of its times
+    return datetime.datetime(*dtJson, tzinfo=_UTC)
 
 
 def pidDebug(*args):
@@ -174,14 +177,20 @@ def pidDebug(*args):
 FnDetails = collections.namedtuple("FnDetails", "filename, lineno, funcname")
 
 
-def workspaceIdentity() -> Optional[str]:
+def _cachedPluginCall(name):
     assert MOD_STATE.plugins
-    return MOD_STATE.plugins.workspaceIdentity()
+    cacheKey = (name, os.getcwd())
+    if cacheKey not in MOD_STATE.workspaceCache:
+        MOD_STATE.workspaceCache[cacheKey] = getattr(MOD_STATE.plugins, name)()
+    return MOD_STATE.workspaceCache[cacheKey]
+
+
+def workspaceIdentity() -> Optional[str]:
+    return _cachedPluginCall("workspaceIdentity")
 
 
 def workspaceProject() -> Optional[str]:
-    assert MOD_STATE.plugins
-    proj, ok = MOD_STATE.plugins.workspaceProject()
+    proj, ok = _cachedPluginCall("workspaceProject")
     if ok:
         return proj
     return os.getenv("WP")
@@ -233,7 +242,7 @@ def cmp_(first, second):  # pylint: disable=invalid-name
 
 def doMsg(*args):
     msg = " ".join(map(str, args))
-    LOG.debug("doMsg(%s)", repr(args))
+    LOG.debug("doMsg(%r)", args)
     if quiet():
         LOG.debug("enqueue message")
         _DEBUGGER.msgQueue.append(msg)
@@ -285,9 +294,96 @@ def killWithSignal(pgrp, signum):
     return False
 
 
-def safeSleep(howLong, jobs):
+def safeSleep(howLong, jobs, pids=()):
     with maybeUnlock(jobs):
-        time.sleep(howLong)
+        waitForAnyPid(pids, howLong)
+
+
+def waitForAnyPid(pids, timeout):
+    """
+    Sleep until one of the processes in pids exits, or for timeout seconds (None
+    to wait for the exit only). Falls back to sleeping for timeout, or for
+    PID_POLL_INTERVAL, when pidfds are not available (non-Linux, python < 3.9).
+    """
+    pidfds = []
+    try:
+        for pid in pids:
+            try:
+                pidfds.append(os.pidfd_open(pid))
+            except AttributeError:
+                break
+            except OSError:
+                # Already gone, or not ours to watch
+                LOG.debug("pidfd_open(%r)", pid, exc_info=True)
+        if pidfds:
+            select.select(pidfds, [], [], timeout)
+        else:
+            time.sleep(PID_POLL_INTERVAL if timeout is None else timeout)
+    finally:
+        for pidfd in pidfds:
+            os.close(pidfd)
+
+
+def pidOk(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except OSError as error:
+        if error.errno == errno.EPERM:
+            # Operation not permitted
+            return True
+        elif error.errno == errno.ESRCH:
+            # No such process
+            return False
+        else:
+            raise
+    return True
+
+
+class Pstree(object):
+    def __init__(self, text):
+        self.text = autoDecode(text).strip() if text else None
+        self.errors = []
+
+
+def getPstree(pid):
+    pstree = Pstree(None)
+    try:
+        return Pstree(subprocess.check_output(["pstree", "-alpg", str(pid)]))
+    except (OSError, subprocess.CalledProcessError) as error:
+        pstree.errors.append(error)
+    try:
+        return Pstree(subprocess.check_output(["ps", "-fp", str(pid)]))
+    except (OSError, subprocess.CalledProcessError) as error:
+        pstree.errors.append(error)
+    return pstree
+
+
+def getPstrees(pids):
+    """Collect the process trees for several PIDs, running the helpers in parallel"""
+    if len(pids) <= 1:
+        return {pid: getPstree(pid) for pid in pids}
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=PSTREE_WORKERS) as executor:
+        return dict(zip(pids, executor.map(getPstree, pids)))
+
+
+def showPstreeForJob(j, pstree):
+    sprint("==============================================")
+    sprint(j)
+    if pstree is None:
+        sprint("PID not found", j.pid)
+    elif not pstree.errors:
+        sprint(pstree.text)
+    elif pidOk(j.pid):
+        sprint("Errors getting PID info for", j.pid)
+        for err in pstree.errors:
+            sprint(err)
+    else:
+        sprint("PID not found", j.pid)
+    sprint("==============================================")
 
 
 def killProcGroup(pgrp, jobs):
@@ -341,6 +437,7 @@ jobrunner.utils.killProcGroup(pgrp, None)
 """
     myPath = ":-:".join(sys.path)
     LOG.debug("argv: %r, exec: %s", sys.argv, sys.executable)
+    import tempfile  # pylint: disable=import-outside-toplevel
     with tempfile.NamedTemporaryFile(mode="w") as tmpf:
         tmpf.write(script)
         tmpf.flush()
@@ -353,7 +450,37 @@ jobrunner.utils.killProcGroup(pgrp, None)
     return None
 
 
+def tailLines(filename: str, count: int, blockSize: int = 8192) -> bytes:
+    """Return the last count lines of filename, like `tail -n<count>`"""
+    blocks = []
+    newlines = 0
+    with open(filename, "rb") as fp:
+        pos = fp.seek(0, os.SEEK_END)
+        # One extra newline is needed to find the start of the first line
+        while pos > 0 and newlines <= count:
+            readSize = min(blockSize, pos)
+            pos -= readSize
+            fp.seek(pos)
+            block = fp.read(readSize)
+            newlines += block.count(b"\n")
+            blocks.append(block)
+    lines = b"".join(reversed(blocks)).split(b"\n")
+    trailing = lines[-1] == b""
+    if trailing:
+        lines.pop()
+    if not lines or count <= 0:
+        return b""
+    return b"\n".join(lines[-count:]) + (b"\n" if trailing else b"")
+
+
 def autoDecode(byteArray: bytes) -> str:
+    try:
+        # Most output is UTF-8 (or plain ASCII), skip the costly detection for it
+        return byteArray.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+
+    import chardet  # pylint: disable=import-outside-toplevel
     detected = chardet.detect(byteArray)
     if not detected:
         return byteArray.decode()